@@ -33,13 +33,13 @@ logger = get_logger("contests.tasks")
     acks_late=True
 )
 def process_edict_task(self, contest_id: int):
-    task_start_time = time.time()
+    task_start_time = time.perf_counter()
     with LogContext(task_name="process_edict", contest_id=contest_id, attempt=self.request.retries + 1) as task_logger:
         db: Session = SessionLocal()
         try:
             processor = EdictProcessor(db=db, contest_id=contest_id)
             result = processor.process()
-            total_duration = round((time.time() - task_start_time) * 1000, 2)
+            total_duration = round((time.perf_counter() - task_start_time) * 1000, 2)
             task_logger.info("Edict processing task completed successfully", total_duration_ms=total_duration)
             return result
         except Exception as exc:
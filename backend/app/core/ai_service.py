@@ -6,9 +6,22 @@ from pydantic import BaseModel as LangChainBaseModel
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 from .logging import get_logger
+from .settings import settings
+from functools import lru_cache
 import time
 
 
+@lru_cache(maxsize=32)
+def compile_prompt_template(prompt_template: str) -> ChatPromptTemplate:
+    """
+    Retorna o ChatPromptTemplate do texto informado, compilado uma única vez por processo.
+
+    Os prompts da aplicação são constantes de módulo; o parsing das variáveis do
+    template não precisa ser refeito a cada chamada à IA.
+    """
+    return ChatPromptTemplate.from_template(prompt_template)
+
+
 class LangChainService:
     def __init__(self, provider: str, api_key: str, model_name: str, temperature: float = 0.2):
         """
@@ -64,7 +77,7 @@ class LangChainService:
         Returns:
             Uma instância do objeto Pydantic 'response_schema' preenchida.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         self.logger.info(
             "Starting structured output generation",
@@ -79,7 +92,7 @@ class LangChainService:
             # Vincula o schema de saída ao modelo para forçar a resposta JSON
             structured_llm = self.llm.with_structured_output(response_schema)
             
-            prompt = ChatPromptTemplate.from_template(prompt_template)
+            prompt = compile_prompt_template(prompt_template)
             
             # Cria a "cadeia" (chain) de execução: dados de entrada -> prompt -> modelo
             chain = prompt | structured_llm
@@ -87,7 +100,7 @@ class LangChainService:
             # Executa a cadeia com os dados de entrada
             response = chain.invoke(prompt_input)
             
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.info(
                 "Structured output generation completed",
@@ -99,7 +112,7 @@ class LangChainService:
             return response
             
         except Exception as e:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.error(
                 "Structured output generation failed",
@@ -118,7 +131,7 @@ class LangChainService:
         """
         Gera uma saída estruturada a partir de uma lista de conteúdos (multimodal).
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Conta tipos de conteúdo para logging
         content_types = {}
@@ -143,7 +156,7 @@ class LangChainService:
             
             response = chain.invoke([message])
             
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.info(
                 "Multimodal content processing completed",
@@ -155,7 +168,7 @@ class LangChainService:
             return response
             
         except Exception as e:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.error(
                 "Multimodal content processing failed",
@@ -168,7 +181,7 @@ class LangChainService:
     
     def invoke_with_history(self, messages: List, response_schema: Type[BaseModel]) -> BaseModel:
         """Invoca o modelo com histórico de conversação."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         self.logger.info(
             "Starting conversation with history",
@@ -183,7 +196,7 @@ class LangChainService:
             
             response = structured_llm.invoke(messages)
             
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.info(
                 "Conversation with history completed",
@@ -195,7 +208,7 @@ class LangChainService:
             return response
             
         except Exception as e:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             self.logger.error(
                 "Conversation with history failed",
@@ -204,4 +217,20 @@ class LangChainService:
                 error=str(e),
                 error_type=type(e).__name__
             )
-            raise
\ No newline at end of file
+            raise
+
+
+@lru_cache(maxsize=8)
+def get_langchain_service(model_name: str, temperature: float = 0.2) -> LangChainService:
+    """
+    Retorna um LangChainService do Google compartilhado por processo para o par (modelo, temperatura).
+
+    Evita recriar o cliente do modelo (e sua conexão HTTP) a cada requisição; o serviço
+    não guarda estado entre chamadas, então pode ser reutilizado com segurança.
+    """
+    return LangChainService(
+        provider="google",
+        api_key=settings.GEMINI_API_KEY,
+        model_name=model_name,
+        temperature=temperature,
+    )
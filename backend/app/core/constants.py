@@ -21,6 +21,18 @@ class AIConstants:
     TEMPERATURE_CREATIVE = 1.0  # Para extração criativa de editais
     TEMPERATURE_PRECISE = 0.2   # Para validação precisa
     TEMPERATURE_BALANCED = 0.5  # Para planejamento de estudos
+    TEMPERATURE_DETERMINISTIC = 0.0  # Para a aula guiada
+
+    # Modelos
+    GUIDED_LESSON_MODEL = "gemini-2.5-flash"
+
+    # Concorrência da aula guiada (por processo)
+    # As rotas da aula guiada são síncronas e rodam no threadpool do AnyIO
+    # (40 workers por padrão). Quem espera por uma vaga também ocupa um worker
+    # durante toda a espera, então a fila deve ser curta: com esperas longas,
+    # poucos alunos bloqueiam o threadpool e derrubam as demais rotas síncronas.
+    GUIDED_LESSON_MAX_CONCURRENT_CALLS = 8   # Chamadas simultâneas ao agente
+    GUIDED_LESSON_QUEUE_TIMEOUT_SECONDS = 5  # Espera máxima por uma vaga (depois, 503)
     
     # Limites de validação para IA
     MAX_RETRIES_AI_VALIDATION = 2  # Máximo de tentativas de correção
@@ -56,6 +68,7 @@ class ValidationConstants:
 class StudyPlanConstants:
     """Constantes específicas para geração de planos de estudo"""
     DEFAULT_IMPACT_WEIGHT = 1.0  # Peso padrão quando não há estrutura de prova definida
+    PROFICIENCY_DECIMALS = 1     # Mesma granularidade da autoavaliação (passos de 0.1)
     
     # Timeouts para diferentes fases do pipeline
     DATA_COLLECTION_TIMEOUT_MS = 5000   # 5 segundos
@@ -97,3 +110,9 @@ class LoggingConstants:
     # Níveis de log estruturado
     PERFORMANCE_THRESHOLD_MS = 1000  # Log como warning se operação > 1s
     SLOW_QUERY_THRESHOLD_MS = 500    # Log queries lentas
+
+
+class HTTPConstants:
+    """Constantes para as respostas HTTP da API"""
+    GZIP_MINIMUM_SIZE_BYTES = 2048  # Respostas menores não compensam a compressão
+    GZIP_COMPRESSION_LEVEL = 1      # Nível mais rápido; texto em linguagem natural já comprime bem
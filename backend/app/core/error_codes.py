@@ -22,6 +22,7 @@ ERROR_CODES = {
     "GEMINI_API_ERROR": "Erro temporário no provedor de IA",
     "AI_VALIDATION_ERROR": "Resposta inválida da IA",
     "MAX_RETRIES_EXCEEDED": "Limite de tentativas excedido",
+    "AI_SERVICE_BUSY": "Serviço de IA sobrecarregado",
     
     # Regras de Negócio
     "EXAM_DATE_PASSED": "Prova já realizada",
@@ -77,6 +77,14 @@ class MaxRetriesExceededError(AIProcessingError):
             details={"operation": operation, "max_retries": max_retries}
         )
 
+class AIServiceBusyError(AIProcessingError):
+    def __init__(self, wait_seconds: int):
+        super().__init__(
+            message="O serviço de IA está sobrecarregado no momento. Tente novamente em instantes.",
+            error_code="AI_SERVICE_BUSY",
+            details={"wait_seconds": wait_seconds}
+        )
+
 # === EXCEÇÕES DE BUSINESS LOGIC ===
 class BusinessLogicError(CoachAIException):
     """Erros de regras de negócio"""
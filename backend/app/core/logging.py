@@ -10,6 +10,7 @@ Este módulo configura um sistema de logging JSON estruturado que facilita:
 
 import logging
 import logging.config
+import re
 import sys
 from typing import Optional
 import uuid
@@ -22,6 +23,9 @@ from structlog import stdlib
 request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 user_id_var: ContextVar[Optional[str]] = ContextVar('user_id', default=None)
 
+# Chaves cujo valor deve ser ocultado nos logs (busca por substring, sem diferenciar maiúsculas)
+SENSITIVE_KEY_PATTERN = re.compile(r"password|token|api_key|secret", re.IGNORECASE)
+
 
 def set_request_context(request_id: str, user_id: Optional[str] = None) -> None:
     """Define o contexto da requisição atual para logs estruturados."""
@@ -84,12 +88,10 @@ def filter_sensitive_data(logger, method_name, event_dict):
     if not isinstance(event_dict, dict):
         return event_dict
         
-    sensitive_fields = ['password', 'token', 'api_key', 'secret']
-    
     def clean_dict(data):
         if isinstance(data, dict):
             return {
-                key: '[REDACTED]' if any(sens in key.lower() for sens in sensitive_fields) 
+                key: '[REDACTED]' if SENSITIVE_KEY_PATTERN.search(key)
                 else clean_dict(value)
                 for key, value in data.items()
             }
@@ -117,6 +119,9 @@ def setup_logging(log_level: str = "INFO", is_development: bool = True) -> None:
     
     # Pipeline simples e compatível - sem CallsiteParameterAdder para evitar problemas
     processors = [
+        # Descarta cedo eventos abaixo do nível configurado, antes de qualquer
+        # processamento (redação, timestamp, renderização)
+        structlog.stdlib.filter_by_level,
         # Adiciona contexto da requisição
         add_request_context,
         # Adiciona severity level
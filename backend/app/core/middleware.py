@@ -85,7 +85,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         set_request_context(request_id, user_id)
         
         # Adiciona request_id nos headers da resposta para facilitar debugging
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Skip logging para alguns endpoints
         skip_logging = request.url.path in self.skip_paths
@@ -106,7 +106,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             # Adiciona o request_id no header da resposta
             response.headers["X-Request-ID"] = request_id
             
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             if not skip_logging:
                 # Log de sucesso
@@ -131,7 +131,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             return response
             
         except Exception as exc:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             
             if not skip_logging:
                 self.logger.error(
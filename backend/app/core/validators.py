@@ -43,12 +43,16 @@ class TopicValidators:
         errors = []
         if len(analyses) <= 1:
             return errors
-        priority_levels = {analysis.priority_level for analysis in analyses}
-        if len(priority_levels) < min_diversity:
-            errors.append(
-                f"Baixa diversidade de prioridades. Encontradas: {priority_levels}. "
-                f"Esperado pelo menos {min_diversity} níveis diferentes."
-            )
+        # Interrompe a varredura assim que a diversidade mínima é atingida (caso comum)
+        priority_levels = set()
+        for analysis in analyses:
+            priority_levels.add(analysis.priority_level)
+            if len(priority_levels) >= min_diversity:
+                return errors
+        errors.append(
+            f"Baixa diversidade de prioridades. Encontradas: {priority_levels}. "
+            f"Esperado pelo menos {min_diversity} níveis diferentes."
+        )
         return errors
 
 
@@ -102,7 +106,7 @@ class ValidationOrchestrator:
         input_topic_ids: Set[int],
         user_contest_id: int,
     ) -> List[str]:
-        validation_start = time.time()
+        validation_start = time.perf_counter()
         all_errors = []
         with LogContext(validation_phase="analysis", user_contest_id=user_contest_id) as val_logger:
             output_ids = {analysis.topic_id for analysis in analysis_response.analyzed_topics}
@@ -111,7 +115,7 @@ class ValidationOrchestrator:
             all_errors.extend(TopicValidators.validate_priority_diversity(analysis_response.analyzed_topics))
             val_logger.info(
                 "Comprehensive analysis validation completed",
-                duration_ms=round((time.time() - validation_start) * 1000, 2),
+                duration_ms=round((time.perf_counter() - validation_start) * 1000, 2),
                 total_errors=len(all_errors),
                 input_topics_count=len(input_topic_ids),
                 output_topics_count=len(output_ids),
@@ -125,14 +129,14 @@ class ValidationOrchestrator:
         max_sessions: int,
         user_contest_id: int,
     ) -> List[str]:
-        validation_start = time.time()
+        validation_start = time.perf_counter()
         all_errors = []
         with LogContext(validation_phase="organization", user_contest_id=user_contest_id) as val_logger:
             all_errors.extend(StudyPlanValidators.validate_session_limit(plan_response, max_sessions))
             all_errors.extend(StudyPlanValidators.validate_plan_completeness(plan_response, input_topic_ids))
             val_logger.info(
                 "Comprehensive organization validation completed",
-                duration_ms=round((time.time() - validation_start) * 1000, 2),
+                duration_ms=round((time.perf_counter() - validation_start) * 1000, 2),
                 total_errors=len(all_errors),
                 planned_sessions_count=len(plan_response.roadmap),
                 max_allowed_sessions=max_sessions,
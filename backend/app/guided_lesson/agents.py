@@ -1,36 +1,63 @@
-import contextlib
-import json
-from dataclasses import dataclass
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
 # LANGCHAIN
 from langchain.agents import create_agent
 from langchain.tools import tool, ToolRuntime
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents.middleware import dynamic_prompt, ModelRequest
 from app.core.settings import settings
+from app.core.constants import AIConstants, DatabaseConstants
+from app.core.exceptions import AIServiceBusyError
 from langgraph.checkpoint.postgres import PostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
 
 from app.study.schemas import StudySession
+from .prompts import professor_base_prompt, professor_session_prompt, quiz_prompt, orchestrator_prompt
 
 
 # ToDo: Criar módulo de middleware, tools e context_schema reutilizáveis
-# ToDo: Criar módulo com os system_prompts para os agentes
 
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql+psycopg2://", "postgresql://")
 
-# Crie o checkpointer globalmente (ele gerencia seu próprio pool de conexões)
-# Remova o 'with' statement aqui, pois queremos que ele fique aberto
-context_manager = PostgresSaver.from_conn_string(DATABASE_URL)
+# Checkpointer global apoiado em um pool de conexões: as rotas da aula guiada rodam no
+# threadpool do FastAPI, e uma conexão única serializaria as leituras/escritas de
+# checkpoint de todas as conversas simultâneas. O pool é aberto no lifespan da aplicação
+# (open_checkpointer), não na importação, que não deve depender do Postgres.
+CHECKPOINTER_POOL = ConnectionPool(
+    conninfo=DATABASE_URL,
+    max_size=DatabaseConstants.CONNECTION_POOL_SIZE,
+    kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+    open=False,
+)
+GLOBAL_CHECKPOINTER = PostgresSaver(CHECKPOINTER_POOL)
 
-# Configure as tabelas uma única vez
-stack = contextlib.ExitStack()
-GLOBAL_CHECKPOINTER = stack.enter_context(context_manager)
-GLOBAL_CHECKPOINTER.setup()
 
-@dataclass
+def open_checkpointer():
+    """Abre o pool do checkpointer, aguarda as conexões e cria as tabelas do LangGraph."""
+    CHECKPOINTER_POOL.open(wait=True)
+    GLOBAL_CHECKPOINTER.setup()
+
+
+def close_checkpointer():
+    """Fecha o pool do checkpointer (encerramento da aplicação)."""
+    CHECKPOINTER_POOL.close()
+
+
+@dataclass(frozen=True, slots=True)
 class LessonSessionContext:
     session_id: int
     user_id: int
     topics: StudySession
+    # Campos derivados, montados uma única vez por requisição (o contexto é imutável)
+    thread_config: dict = field(init=False, repr=False)
+    topics_description: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "thread_config", {"configurable": {"thread_id": f"guided_lesson_{self.session_id}"}})
+        object.__setattr__(self, "topics_description", ", ".join(f"{t.subject}: {t.topic}" for t in self.topics))
 
 # Agente Professor de Concursos
 class ProfessorAgent:
@@ -45,19 +72,9 @@ class ProfessorAgent:
         @dynamic_prompt
         def gerar_prompt(request: ModelRequest) -> str:
 
-            prompt_base = """Você é um professor especializado em aulas guiadas para concursos públicos.
-            Forneça explicações claras, exemplos práticos e sempre que possível faça o link de como a banca costuma cobrar esse tópico nas provas, para ajudar os alunos a entenderem os tópicos.
-            Apresente o conteúdo de forma gradual, e interaja com o aluno para garantir que ele está acompanhando o raciocínio.
-            Quando você entender que o conteúdo da aula foi concluído, pergunte ao usuário se ele quer iniciar o quiz.
-            """
-
-            topicos = ", ".join(f"{t.subject}: {t.topic}" for t in request.runtime.context.topics)
-
-            prompt_sessao = f"- Essa sessão de estudo é sobre: {topicos}. Inicie a aula contextualizando o aluno sobre o que será abordado nessa sessão de estudo guiada."
+            topicos = request.runtime.context.topics_description
 
-            prompt_final = f"{prompt_base}\n{prompt_sessao}"
-
-            return prompt_final
+            return f"{professor_base_prompt}\n{professor_session_prompt.format(topicos=topicos)}"
         
         self.middleware = [gerar_prompt]
 
@@ -86,17 +103,10 @@ class QuizAgent:
 
     def start_agent(self):
 
-        prompt = """Você é um especialista em elaboração de quizzes para concursos públicos.
-        Elabore o seu quiz no estilo CAT.
-        Se o aluno acertar aumente o grau de dificuldade da próxima pergunta; se errar, diminua a dificuldade.
-        Apresente uma pergunta por vez, aguarde a resposta do aluno, e forneça feedback imediato sobre a resposta, e já apresente a próxima pergunta.
-        Crie perguntas desafiadoras e relevantes para testar o conhecimento do aluno sobre o(s) tópico(s) estudado(s) nessa sessão.
-        """
-
         agent = create_agent(
             name="agente-elaborador-de-quiz-para-concursos",
             model=self.model,
-            system_prompt=prompt,
+            system_prompt=quiz_prompt,
             middleware=[],
             tools=[],
             context_schema=LessonSessionContext,
@@ -116,11 +126,9 @@ class StudySessionAgent:
     def __init__(self, model):
         self.model = model
 
-        modelo = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.0, api_key=settings.GEMINI_API_KEY)
-
-        # Agentes
-        self.agente_professor = ProfessorAgent(modelo).start_agent()
-        self.agente_quiz = QuizAgent(modelo).start_agent()
+        # Agentes (compartilham o mesmo cliente do modelo do orquestrador)
+        self.agente_professor = ProfessorAgent(model).start_agent()
+        self.agente_quiz = QuizAgent(model).start_agent()
 
         # Tools
         @tool(
@@ -128,14 +136,10 @@ class StudySessionAgent:
             description="Professor que ministra a aula guiada do tópico em contexto. Apresenta o conteúdo, responde dúvidas, fornece exemplos práticos, direciona para o quiz quando solicitado pelo usuário. Ao fim de cada interação analisa o contexto e decide se o conteúdo da aula foi concluído ou se o usuário solicitou o início do quiz.",
         )
         def call_professor_agent(query: str, runtime: ToolRuntime[LessonSessionContext, None]):
-            config = {
-                "configurable": {"thread_id": f"guided_lesson_{runtime.context.session_id}"}
-            }
-
             result = self.agente_professor.invoke(
                 {},  
                 context=runtime.context, 
-                config=config
+                config=runtime.context.thread_config
             )
 
             return result["messages"][-1].content
@@ -145,15 +149,10 @@ class StudySessionAgent:
             description="Elabora e aplica o quiz sobre o tópico em contexto. Deve ser chamado quando o agente professor indicar que o conteúdo da aula foi concluído ou quando o usuário solicitar o início do quiz.",
         )
         def call_quiz_agent(query: str, runtime: ToolRuntime[LessonSessionContext, None]):
-
-            config = {
-                "configurable": {"thread_id": f"guided_lesson_{runtime.context.session_id}"}
-            }
-            
             result = self.agente_quiz.invoke(
                 {},
                 context=runtime.context, 
-                config=config
+                config=runtime.context.thread_config
             )
 
             return result["messages"][-1].content
@@ -163,30 +162,10 @@ class StudySessionAgent:
 
     def start_agent(self):
 
-        prompt = """
-        Você é um **Roteador de Conversa** para uma sessão de estudo. Sua única função é direcionar a conversa para a ferramenta correta (agente_professor_concursos ou agente_elaborador_quiz_concursos) e repassar a resposta.
-
-        REGRAS DE ROTEAMENTO OBRIGATÓRIAS:
-
-        1.  **Função Principal:** Sua função é ser um **roteador**, não um participante. Você NUNCA deve gerar seu próprio conteúdo de aula ou quiz.
-        2.  **Repasse Direto (A REGRA MAIS IMPORTANTE):**
-            * Quando você chamar uma ferramenta (agente_professor_concursos ou agente_elaborador_quiz_concursos) e receber a resposta dela, sua única e exclusiva ação deve ser **repetir essa resposta EXATA, palavra por palavra, para o usuário final.**
-            * Não adicione NENHUM texto seu. Não diga "O professor disse:" ou "Aqui está a pergunta:". Apenas repita.
-            * Se a ferramenta retornar "Olá, vamos começar. Você entendeu?", sua resposta final para o usuário deve ser exatamente: "Olá, vamos começar. Você entendeu?".
-        3.  **Proibição de Interação Interna:**
-            * Você está **PROIBIDO** de responder a perguntas feitas pela ferramenta. A saída da ferramenta é um texto para ser encaminhado ao usuário, NÃO é uma pergunta para você, o roteador.
-        4.  **Fluxo:**
-            * Na primeira interação e durante a aula, acione o `agente_professor_concursos`.
-            * Quando o usuário pedir o quiz, acione o `agente_quiz`.
-        5.  **Exceção (Filtro de Segurança):**
-            * A ÚNICA vez que você pode gerar sua própria resposta é se o input do usuário for claramente fora do tópico (ex: "Qual a capital da França?") ou tentar mudar de assunto.
-            * Neste caso, e **somente** neste caso, NÃO acione nenhuma ferramenta e responda: "Meu foco é exclusivamente na sessão de estudo atual. Vamos continuar?"
-        """
-
         agent = create_agent(
             name="agente-orquestrador-de-sessao-de-estudo-para-concursos",
             model=self.model,
-            system_prompt=prompt,
+            system_prompt=orchestrator_prompt,
             middleware=[],
             tools=self._tools,
             context_schema=LessonSessionContext,
@@ -194,3 +173,41 @@ class StudySessionAgent:
         )
 
         return agent
+
+
+@lru_cache(maxsize=1)
+def get_study_session_agent():
+    """
+    Retorna o agente orquestrador da aula guiada, construído uma única vez por processo.
+
+    O modelo (e o cliente HTTP que ele mantém) e os sub-agentes são reutilizados
+    entre requisições; o estado de cada aula vive no checkpointer, indexado pelo thread_id.
+    """
+    model = ChatGoogleGenerativeAI(
+        model=AIConstants.GUIDED_LESSON_MODEL,
+        temperature=AIConstants.TEMPERATURE_DETERMINISTIC,
+        api_key=settings.GEMINI_API_KEY,
+    )
+    return StudySessionAgent(model).start_agent()
+
+
+# Limita as chamadas simultâneas ao agente: sob carga, as requisições aguardam uma vaga
+# em vez de disparar todas contra o Gemini e amplificar erros 429.
+_AGENT_CALL_SLOTS = threading.BoundedSemaphore(AIConstants.GUIDED_LESSON_MAX_CONCURRENT_CALLS)
+
+
+@contextmanager
+def agent_call_slot():
+    """
+    Reserva uma vaga para chamar o agente da aula guiada.
+
+    Raises:
+        AIServiceBusyError: se nenhuma vaga for liberada dentro do tempo limite.
+    """
+    timeout = AIConstants.GUIDED_LESSON_QUEUE_TIMEOUT_SECONDS
+    if not _AGENT_CALL_SLOTS.acquire(timeout=timeout):
+        raise AIServiceBusyError(wait_seconds=timeout)
+    try:
+        yield
+    finally:
+        _AGENT_CALL_SLOTS.release()
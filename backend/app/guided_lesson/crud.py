@@ -1,24 +1,81 @@
-
-from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
 
-from . import models, schemas
+from app.study.models import StudyRoadmapSession
 from app.users.models import UserContest
-from app.contests.models import ContestRole, ProgrammaticContent
+from . import models
 
 
-def add_message_to_history(db: Session, session_id: int, sender_type: models.SenderType, content: str) -> models.MessageHistory:
+def add_message_to_history(
+    db: Session,
+    session_id: int,
+    sender_type: models.SenderType,
+    content: str,
+    timestamp: Optional[datetime] = None,
+) -> models.MessageHistory:
     """Adiciona uma nova mensagem ao histórico de uma sessão."""
     db_message = models.MessageHistory(
         session_id=session_id,
         sender_type=sender_type,
-        content=content
+        content=content,
+        timestamp=timestamp or datetime.utcnow(),
     )
     db.add(db_message)
     db.commit()
     db.refresh(db_message)
     return db_message
 
+def add_chat_turn_to_history(
+    db: Session,
+    session_id: int,
+    user_content: str,
+    user_sent_at: datetime,
+    ai_content: str,
+) -> None:
+    """Persiste a mensagem do usuário e a resposta do agente em uma única transação."""
+    db.add_all([
+        models.MessageHistory(
+            session_id=session_id,
+            sender_type=models.SenderType.USER,
+            content=user_content,
+            timestamp=user_sent_at,
+        ),
+        models.MessageHistory(
+            session_id=session_id,
+            sender_type=models.SenderType.AI,
+            content=ai_content,
+        ),
+    ])
+    db.commit()
+
+def user_owns_session(db: Session, session_id: int, user_id: int) -> bool:
+    """
+    Verifica se a sessão de estudo pertence ao usuário.
+
+    Usa EXISTS sobre as chaves (sessão -> inscrição -> usuário), sem carregar a linha
+    da sessão, que pode trazer o layout gerado (JSONB) junto.
+    """
+    return db.query(
+        db.query(StudyRoadmapSession.id)
+        .join(UserContest, StudyRoadmapSession.user_contest_id == UserContest.id)
+        .filter(StudyRoadmapSession.id == session_id, UserContest.user_id == user_id)
+        .exists()
+    ).scalar()
+
 def get_full_conversation_history(db: Session, session_id: int):
     """Retorna o histórico completo de mensagens de uma sessão."""
-    return db.query(models.MessageHistory).filter(models.MessageHistory.session_id == session_id).order_by(models.MessageHistory.timestamp.asc()).all()
\ No newline at end of file
+    return db.query(models.MessageHistory).filter(models.MessageHistory.session_id == session_id).order_by(models.MessageHistory.timestamp.asc()).all()
+
+def get_recent_conversation_history(db: Session, session_id: int, limit: int):
+    """
+    Retorna as `limit` mensagens mais recentes de uma sessão, em ordem cronológica.
+
+    Busca em ordem decrescente com LIMIT (servido pelo índice (session_id, timestamp))
+    e inverte em Python, sem carregar o histórico inteiro de aulas longas.
+    """
+    recent = db.query(models.MessageHistory).filter(
+        models.MessageHistory.session_id == session_id
+    ).order_by(models.MessageHistory.timestamp.desc()).limit(limit).all()
+    recent.reverse()
+    return recent
\ No newline at end of file
@@ -1,7 +1,7 @@
 
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLAlchemyEnum, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLAlchemyEnum, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -16,6 +16,10 @@ class SenderType(str, enum.Enum):
 
 class MessageHistory(Base):
     __tablename__ = "message_history"
+    __table_args__ = (
+        # O histórico é sempre lido por sessão em ordem cronológica
+        Index("ix_message_history_session_timestamp", "session_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -23,7 +27,7 @@ class MessageHistory(Base):
     content = Column(Text, nullable=False)
 
     # Foreign Key
-    session_id = Column(Integer, ForeignKey("study_roadmap_sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("study_roadmap_sessions.id", ondelete="CASCADE"), nullable=False)
 
     # Relationship
     session = relationship("StudyRoadmapSession", back_populates="messages")
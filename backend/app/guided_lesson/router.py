@@ -1,19 +1,26 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from langchain_google_genai import ChatGoogleGenerativeAI
 import json
+from typing import Optional
+from datetime import datetime
 
 from app.core.database import get_db
 from app.users.auth import get_current_user
 from app.users import schemas as user_schemas
-from app.core.settings import settings
 from app.study.schemas import StudySession
 from . import crud, schemas, models
-from .agents import StudySessionAgent, LessonSessionContext
+from .agents import get_study_session_agent, agent_call_slot, LessonSessionContext
 
 router = APIRouter()
 
+
+def _ensure_session_owner(db: Session, session_id: int, user_id: int) -> None:
+    """Retorna 404 se a sessão de estudo não existe ou não pertence ao usuário."""
+    if not crud.user_owns_session(db, session_id=session_id, user_id=user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sessão de estudo não encontrada ou não pertence ao usuário.")
+
+
 @router.post("/start", response_model=schemas.LessonStartResponse, status_code=status.HTTP_201_CREATED)
 def start_guided_lesson(
     request: StudySession,
@@ -23,6 +30,7 @@ def start_guided_lesson(
     """Inicia uma nova sessão de aula guiada."""
 
     session_id = request.session_id
+    _ensure_session_owner(db, session_id, current_user.id)
 
     # Create context for the agent
     ctx = LessonSessionContext(
@@ -31,17 +39,17 @@ def start_guided_lesson(
         topics=request.topics,
     )
 
-    model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.0, api_key=settings.GEMINI_API_KEY)
-    agent = StudySessionAgent(model).start_agent()
+    agent = get_study_session_agent()
 
     # Converte a lista de tópicos em uma string para o prompt inicial
-    topicos = ", ".join(f"{t.subject}: {t.topic}" for t in request.topics)
+    topicos = ctx.topics_description
     
     initial_content = f"Vamos iniciar a sessão de estudo guiada. O conteúdo dessa será será sobre: '{topicos}'. Por favor, comece a aula guiada."
     
-    res = agent.invoke({
-        "messages": [{"role": "user", "content": initial_content}]
-        }, context=ctx, config={"configurable": {"thread_id": f"guided_lesson_{session_id}"}})
+    with agent_call_slot():
+        res = agent.invoke({
+            "messages": [{"role": "user", "content": initial_content}]
+            }, context=ctx, config=ctx.thread_config)
     
     raw_content = res["messages"][-1].content
     if isinstance(raw_content, list) and raw_content and 'text' in raw_content[0]:
@@ -64,17 +72,21 @@ def start_guided_lesson(
 def handle_chat_message(
     session_id: int,
     request: schemas.ChatMessageRequest,
+    include_history: bool = True,
     db: Session = Depends(get_db),
     current_user: user_schemas.User = Depends(get_current_user),
 ):
-    """Processa uma mensagem do usuário e retorna a resposta do agente."""
-    # 1. Salvar mensagem do usuário
-    crud.add_message_to_history(
-        db=db,
-        session_id=session_id,
-        sender_type=models.SenderType.USER,
-        content=request.content
-    )
+    """
+    Processa uma mensagem do usuário e retorna a resposta do agente.
+
+    Com include_history=false o histórico não é relido do banco e a resposta traz
+    uma lista vazia; útil para clientes que já mantêm a conversa localmente.
+    """
+    # 1. Registrar o horário da mensagem do usuário; ela é persistida junto com a
+    #    resposta do agente, sem uma escrita no banco antes da chamada ao LLM
+    #    (se o agente falhar, é persistida sozinha antes de propagar o erro)
+    user_sent_at = datetime.utcnow()
+    _ensure_session_owner(db, session_id, current_user.id)
 
     # 2. Construir contexto e histórico para o agente
     ctx = LessonSessionContext(
@@ -84,14 +96,25 @@ def handle_chat_message(
     )
     
     # 3. Chamar o agente
-    model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.0, api_key=settings.GEMINI_API_KEY)
-    agent = StudySessionAgent(model).start_agent()
+    agent = get_study_session_agent()
     input_messages = {"messages": [{"role": "user", "content": request.content}]}
-    res = agent.invoke(
-        input_messages,
-        context=ctx, 
-        config={"configurable": {"thread_id": f"guided_lesson_{session_id}"}}
-    )
+    try:
+        with agent_call_slot():
+            res = agent.invoke(
+                input_messages,
+                context=ctx, 
+                config=ctx.thread_config
+            )
+    except Exception:
+        # Sem resposta do agente (erro ou sem vaga): não perder a mensagem do usuário
+        crud.add_message_to_history(
+            db=db,
+            session_id=session_id,
+            sender_type=models.SenderType.USER,
+            content=request.content,
+            timestamp=user_sent_at,
+        )
+        raise
     
     raw_content = res["messages"][-1].content
     if isinstance(raw_content, list) and raw_content and 'text' in raw_content[0]:
@@ -101,26 +124,35 @@ def handle_chat_message(
 
     agent_response_content = json.dumps({"text": content_to_save})
 
-    # 4. Salvar resposta do agente
-    crud.add_message_to_history(
+    # 4. Salvar mensagem do usuário e resposta do agente
+    crud.add_chat_turn_to_history(
         db=db,
         session_id=session_id,
-        sender_type=models.SenderType.AI,
-        content=agent_response_content
+        user_content=request.content,
+        user_sent_at=user_sent_at,
+        ai_content=agent_response_content
     )
 
-    # 5. Retornar a resposta e o histórico atualizado
-    updated_history = crud.get_full_conversation_history(db, session_id=session_id)
+    # 5. Retornar a resposta e, se solicitado, o histórico atualizado
+    updated_history = crud.get_full_conversation_history(db, session_id=session_id) if include_history else []
     
     return {"agent_response": agent_response_content, "history": updated_history}
 
 @router.get("/{session_id}/history", response_model=list[schemas.MessageHistoryInDB])
 def get_chat_history(
     session_id: int,
+    limit: Optional[int] = Query(default=None, ge=1),
     db: Session = Depends(get_db),
     current_user: user_schemas.User = Depends(get_current_user),
 ):
-    """Retorna o histórico de mensagens de uma sessão de aula guiada."""
-    # TODO: Add validation to ensure the user has access to this session
+    """
+    Retorna o histórico de mensagens de uma sessão de aula guiada.
+
+    Com `limit`, retorna apenas as mensagens mais recentes (em ordem cronológica).
+    """
+    _ensure_session_owner(db, session_id, current_user.id)
+
+    if limit is not None:
+        return crud.get_recent_conversation_history(db, session_id=session_id, limit=limit)
     history = crud.get_full_conversation_history(db, session_id=session_id)
     return history
\ No newline at end of file
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from app.core.database import engine
@@ -6,7 +7,9 @@ from app.users.router import router as users_router
 from app.contests.router import router as contests_router
 from app.study.router import router as study_router
 from app.guided_lesson.router import router as guided_lesson_router
+from app.guided_lesson.agents import get_study_session_agent, open_checkpointer, close_checkpointer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.core.exceptions import CoachAIException
 from app.core.exception_handlers import (
     coach_ai_exception_handler,
@@ -14,6 +17,7 @@ from app.core.exception_handlers import (
 )
 from app.core.middleware import SecurityHeadersMiddleware, RequestLoggingMiddleware
 from app.core.settings import settings
+from app.core.constants import HTTPConstants
 from app.core.logging import setup_logging, get_logger
 
 # Configura o sistema de logging estruturado
@@ -42,10 +46,24 @@ logger.info("Creating database tables")
 models.Base.metadata.create_all(bind=engine)
 logger.info("Database tables created successfully")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abre o pool do checkpointer da aula guiada e cria suas tabelas
+    logger.info("Opening guided lesson checkpointer")
+    open_checkpointer()
+    # Constrói o agente da aula guiada (modelo, sub-agentes, grafo) na inicialização,
+    # para que a primeira requisição de chat não pague esse custo
+    logger.info("Warming up guided lesson agent")
+    get_study_session_agent()
+    yield
+    logger.info("Closing guided lesson checkpointer")
+    close_checkpointer()
+
 app = FastAPI(
     title="Concurso Coach AI API",
     description="A API para a plataforma de estudos para concursos.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Lista de origens que têm permissão para fazer requisições à nossa API
@@ -71,6 +89,14 @@ app.add_middleware(RequestLoggingMiddleware)
 logger.info("Adding security headers middleware")
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Compressão gzip para respostas grandes (históricos de aula, planos de estudo), quando o cliente aceita
+logger.info("Adding gzip middleware", minimum_size=HTTPConstants.GZIP_MINIMUM_SIZE_BYTES)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=HTTPConstants.GZIP_MINIMUM_SIZE_BYTES,
+    compresslevel=HTTPConstants.GZIP_COMPRESSION_LEVEL,
+)
+
 # Exception handlers
 logger.info("Configuring exception handlers")
 app.add_exception_handler(CoachAIException, coach_ai_exception_handler)
@@ -8,14 +8,14 @@ permitindo diferentes estratégias de validação para diferentes tipos de respo
 """
 
 import time
-from typing import Type, Callable, List, Dict, Any
+from typing import Type, Callable, List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import AIMessage
 
-from app.core.ai_service import LangChainService
+from app.core.ai_service import LangChainService, compile_prompt_template
 from app.core.constants import AIConstants
 from app.core.logging import get_logger, LogContext
+from app.study.prompts import json_correction_prompt
 
 
 class AIValidationService:
@@ -40,7 +40,8 @@ class AIValidationService:
         prompt_input: dict,
         response_schema: Type[BaseModel],
         validation_function: Callable[[BaseModel], List[str]],
-        context: Dict[str, Any] = None
+        context: Dict[str, Any] = None,
+        repair_function: Optional[Callable[[BaseModel], BaseModel]] = None
     ) -> BaseModel:
         """
         Orquestra uma chamada de IA com ciclo de validação e auto-correção.
@@ -51,6 +52,8 @@ class AIValidationService:
             response_schema: Schema Pydantic para validação sintática
             validation_function: Função para validação de negócio
             context: Contexto adicional para logs
+            repair_function: Correção determinística opcional, aplicada antes de pedir
+                uma nova tentativa à IA (ex.: descartar IDs inventados)
             
         Returns:
             BaseModel: Resposta validada da IA
@@ -58,7 +61,7 @@ class AIValidationService:
         Raises:
             Exception: Se todas as tentativas de correção falharem
         """
-        ai_start = time.time()
+        ai_start = time.perf_counter()
         context = context or {}
         
         with LogContext(
@@ -73,16 +76,18 @@ class AIValidationService:
             )
             
             # Preparar mensagens iniciais
-            current_messages = self.conversation_history.copy()
-            prompt = ChatPromptTemplate.from_template(prompt_template)
+            base_messages = self.conversation_history.copy()
+            prompt = compile_prompt_template(prompt_template)
             user_messages = prompt.format_messages(**prompt_input)
-            current_messages.extend(user_messages)
+            base_messages.extend(user_messages)
+            current_messages = base_messages
             
             last_error = None
             ai_response_obj = None
             
             for attempt in range(self.max_retries + 1):
-                attempt_start = time.time()
+                attempt_start = time.perf_counter()
+                ai_response_obj = None
                 
                 ai_logger.info(
                     "Starting AI attempt",
@@ -101,13 +106,18 @@ class AIValidationService:
                     ai_logger.debug("Running business validation")
                     validation_errors = validation_function(ai_response_obj)
                     
+                    if validation_errors and repair_function:
+                        ai_response_obj, validation_errors = self._try_repair(
+                            ai_response_obj, validation_errors, validation_function, repair_function, ai_logger
+                        )
+                    
                     if validation_errors:
                         error_message = "Validação de negócio falhou:\n- " + "\n- ".join(validation_errors)
                         raise ValueError(error_message)
                     
                     # Sucesso - atualizar histórico e retornar
-                    attempt_duration = round((time.time() - attempt_start) * 1000, 2)
-                    total_duration = round((time.time() - ai_start) * 1000, 2)
+                    attempt_duration = round((time.perf_counter() - attempt_start) * 1000, 2)
+                    total_duration = round((time.perf_counter() - ai_start) * 1000, 2)
                     
                     ai_logger.info(
                         "AI validation cycle completed successfully",
@@ -123,7 +133,7 @@ class AIValidationService:
                     
                 except Exception as e:
                     last_error = e
-                    attempt_duration = round((time.time() - attempt_start) * 1000, 2)
+                    attempt_duration = round((time.perf_counter() - attempt_start) * 1000, 2)
                     
                     ai_logger.warning(
                         "AI attempt failed",
@@ -144,11 +154,42 @@ class AIValidationService:
                     
                     # Preparar prompt de correção para próxima tentativa
                     current_messages = self._prepare_correction_prompt(
-                        current_messages, ai_response_obj, e, ai_logger
+                        base_messages, ai_response_obj, e, ai_logger
                     )
                     
             raise Exception(f"Falha ao obter uma resposta válida da IA. Último erro: {last_error}")
             
+    def _try_repair(
+        self,
+        ai_response_obj: BaseModel,
+        validation_errors: List[str],
+        validation_function: Callable[[BaseModel], List[str]],
+        repair_function: Callable[[BaseModel], BaseModel],
+        logger
+    ) -> Tuple[BaseModel, List[str]]:
+        """
+        Tenta corrigir a resposta localmente, evitando uma nova chamada à IA.
+        
+        Returns:
+            tuple: (resposta corrigida, []) se a correção passou na validação;
+                caso contrário, (resposta original, erros originais)
+        """
+        repaired_obj = repair_function(ai_response_obj)
+        remaining_errors = validation_function(repaired_obj)
+        
+        if remaining_errors:
+            logger.info(
+                "Deterministic repair insufficient - falling back to AI correction",
+                remaining_errors=len(remaining_errors)
+            )
+            return ai_response_obj, validation_errors
+            
+        logger.info(
+            "AI response repaired deterministically",
+            repaired_errors=validation_errors
+        )
+        return repaired_obj, []
+        
     def _update_conversation_history(self, current_messages: list, ai_response_obj: BaseModel):
         """
         Atualiza o histórico de conversação após sucesso.
@@ -157,16 +198,13 @@ class AIValidationService:
             current_messages: Mensagens da tentativa atual
             ai_response_obj: Resposta bem-sucedida da IA
         """
-        # Atualizar histórico principal
-        self.conversation_history = current_messages
-        
-        # Adicionar resposta da IA como AIMessage
-        ai_response_json_str = ai_response_obj.json()
-        self.conversation_history.append(AIMessage(content=ai_response_json_str))
+        # Atualizar histórico principal com a resposta da IA como AIMessage
+        ai_response_json_str = ai_response_obj.model_dump_json()
+        self.conversation_history = current_messages + [AIMessage(content=ai_response_json_str)]
         
     def _prepare_correction_prompt(
         self, 
-        current_messages: list, 
+        base_messages: list, 
         ai_response_obj: BaseModel, 
         error: Exception,
         logger
@@ -174,43 +212,41 @@ class AIValidationService:
         """
         Prepara prompt de correção para a próxima tentativa.
         
+        Apenas a correção mais recente é enviada: as respostas inválidas de
+        tentativas anteriores não são reenviadas a cada nova tentativa.
+        
         Args:
-            current_messages: Mensagens da tentativa atual
+            base_messages: Mensagens iniciais do ciclo (histórico + prompt original)
             ai_response_obj: Resposta inválida (pode ser None)
             error: Erro que ocorreu
             logger: Logger para registrar ação
             
         Returns:
-            list: Mensagens atualizadas com prompt de correção
+            list: Nova lista com as mensagens iniciais e o prompt de correção
         """
         # Extrair resposta inválida da IA para usar no prompt de correção
         invalid_response_str = ""
         if ai_response_obj:  # Falha de validação de negócio
-            invalid_response_str = ai_response_obj.json()
+            invalid_response_str = ai_response_obj.model_dump_json()
         elif hasattr(error, 'llm_output'):  # Erro do LangChain
             invalid_response_str = getattr(error, 'llm_output', str(error))
         else:
             invalid_response_str = str(error)
             
-        # Importar prompt de correção
-        from app.study.prompts import json_correction_prompt
-        
         correction_prompt_input = {
             "error_message": str(error),
             "invalid_response": invalid_response_str
         }
         
-        correction_prompt = ChatPromptTemplate.from_template(json_correction_prompt)
+        correction_prompt = compile_prompt_template(json_correction_prompt)
         correction_messages = correction_prompt.format_messages(**correction_prompt_input)
         
-        current_messages.extend(correction_messages)
-        
         logger.info(
             "Built correction prompt for next attempt",
             correction_prompt_length=len(correction_messages)
         )
         
-        return current_messages
+        return base_messages + correction_messages
         
     def reset_conversation_history(self):
         """
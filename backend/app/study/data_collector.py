@@ -54,7 +54,7 @@ class StudyDataCollector:
         Raises:
             HTTPException: Se dados obrigatórios estão ausentes ou inválidos
         """
-        collection_start = time.time()
+        collection_start = time.perf_counter()
         
         with LogContext(phase="data_collection", user_contest_id=user_contest.id) as phase_logger:
             phase_logger.info("Starting data collection phase")
@@ -70,7 +70,7 @@ class StudyDataCollector:
                 user_contest, impact_map, phase_logger
             )
             
-            collection_duration = round((time.time() - collection_start) * 1000, 2)
+            collection_duration = round((time.perf_counter() - collection_start) * 1000, 2)
             
             phase_logger.info(
                 "Data collection phase completed",
@@ -199,7 +199,9 @@ class StudyDataCollector:
                 "exam_module": topic.exam_module,
                 "subject": topic.subject,
                 "topic_name": topic.topic,
-                "proficiency": proficiency,
+                # Arredonda para a granularidade da autoavaliação: evita ruído de ponto
+                # flutuante (e tokens) no prompt; progresso sem nota conta como 0.0
+                "proficiency": round(proficiency or 0.0, StudyPlanConstants.PROFICIENCY_DECIMALS),
                 "subject_weight": effective_impact
             })
             
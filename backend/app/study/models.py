@@ -4,7 +4,7 @@ from app.core.database import Base
 from sqlalchemy.dialects.postgresql import JSONB
 
 roadmap_session_topics = Table('roadmap_session_topics', Base.metadata,
-    Column('session_id', ForeignKey('study_roadmap_sessions.id'), primary_key=True),
+    Column('session_id', ForeignKey('study_roadmap_sessions.id', ondelete='CASCADE'), primary_key=True),
     Column('topic_id', ForeignKey('programmatic_content.id'), primary_key=True)
 )
 
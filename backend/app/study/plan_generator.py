@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.users.models import UserContest
-from app.core.ai_service import LangChainService
+from app.core.ai_service import get_langchain_service
 from app.core.logging import get_logger, LogContext
 from app.core.constants import AIConstants, ValidationConstants
 from .ai_schemas import AITopicAnalysisResponse, AIStudyPlanResponse
@@ -18,7 +18,6 @@ from app.study.data_collector import StudyDataCollector
 from app.study.topic_analyzer import StudyTopicAnalyzer
 from app.study.plan_organizer import StudyPlanOrganizer
 from app.study.plan_persister import StudyPlanPersister
-from app.core.settings import settings
 
 
 class StudyPlanGenerator:
@@ -28,9 +27,7 @@ class StudyPlanGenerator:
         self.logger = get_logger("study.plan_generator")
 
         # Serviço de IA compartilhado pelas fases
-        self.ai_service = LangChainService(
-            provider="google",
-            api_key=settings.GEMINI_API_KEY,
+        self.ai_service = get_langchain_service(
             model_name="gemini-2.5-pro",
             temperature=AIConstants.TEMPERATURE_BALANCED,
         )
@@ -43,7 +40,7 @@ class StudyPlanGenerator:
 
     def generate(self):
         """Orquestra o pipeline de geração do plano de estudo."""
-        pipeline_start = time.time()
+        pipeline_start = time.perf_counter()
         with LogContext(pipeline="study_plan_generation", user_contest_id=self.user_contest.id) as log:
             log.info("Starting study plan generation pipeline", contest_name=self.user_contest.role.contest.name, user_id=self.user_contest.user_id)
             try:
@@ -67,7 +64,7 @@ class StudyPlanGenerator:
 
                 log.info(
                     "Study plan generation pipeline completed successfully",
-                    total_duration_ms=round((time.time() - pipeline_start) * 1000, 2),
+                    total_duration_ms=round((time.perf_counter() - pipeline_start) * 1000, 2),
                     roadmap_items_created=created_count,
                     total_sessions_available=topics_data.total_sessions,
                     topics_processed=len(topics_data.topics_data_for_ai),
@@ -82,7 +79,7 @@ class StudyPlanGenerator:
             except Exception as e:
                 log.error(
                     "Study plan generation pipeline failed",
-                    total_duration_ms=round((time.time() - pipeline_start) * 1000, 2),
+                    total_duration_ms=round((time.perf_counter() - pipeline_start) * 1000, 2),
                     error=str(e),
                     error_type=type(e).__name__,
                 )
@@ -4,7 +4,6 @@
 StudyPlanOrganizer: Responsável pela organização final do plano de estudos.
 """
 
-import json
 import time
 from typing import List, Set
 
@@ -22,12 +21,13 @@ class StudyPlanOrganizer:
         self.logger = get_logger("study.plan_organizer")
         
     def organize_plan(self, analysis: AITopicAnalysisResponse, total_sessions: int, input_topic_ids: Set[int], user_contest_id: int) -> AIStudyPlanResponse:
-        organization_start = time.time()
+        organization_start = time.perf_counter()
         with LogContext(phase="plan_organization", user_contest_id=user_contest_id) as phase_logger:
-            analyzed_data = analysis.dict()
             prompt_input = {
                 "total_sessions": total_sessions,
-                "analyzed_topics_json": json.dumps(analyzed_data, indent=2),
+                # Serializa direto do modelo (pydantic-core), sem passar por dict + json da stdlib.
+                # JSON compacto: a indentação só adicionaria tokens de entrada ao prompt
+                "analyzed_topics_json": analysis.model_dump_json(),
             }
             final_plan_obj = self._invoke_ai_with_validation(
                 prompt_input=prompt_input,
@@ -37,7 +37,7 @@ class StudyPlanOrganizer:
             )
             phase_logger.info(
                 "Plan organization phase completed",
-                duration_ms=round((time.time() - organization_start) * 1000, 2),
+                duration_ms=round((time.perf_counter() - organization_start) * 1000, 2),
                 roadmap_sessions_count=len(final_plan_obj.roadmap),
             )
             return final_plan_obj
@@ -54,10 +54,25 @@ class StudyPlanOrganizer:
                 user_contest_id=user_contest_id,
             )
 
+        def drop_invented_topics(response: AIStudyPlanResponse) -> AIStudyPlanResponse:
+            # Remove das sessões os topic_ids inventados; tópicos ausentes ainda exigem nova tentativa.
+            # Sessões que ficam sem tópicos são descartadas e as restantes renumeradas, para que o
+            # roadmap persistido não tenha lacunas em session_number
+            kept_sessions = []
+            for session in response.roadmap:
+                valid_ids = [tid for tid in session.topic_ids if tid in input_topic_ids]
+                if valid_ids:
+                    kept_sessions.append(session.model_copy(update={
+                        "topic_ids": valid_ids,
+                        "session_number": len(kept_sessions) + 1,
+                    }))
+            return response.model_copy(update={"roadmap": kept_sessions})
+
         return validation_service.invoke_with_validation(
             prompt_template=plan_organization_prompt,
             prompt_input=prompt_input,
             response_schema=AIStudyPlanResponse,
             validation_function=validate_plan_response,
             context={"phase": "plan_organization", "user_contest_id": user_contest_id},
+            repair_function=drop_invented_topics,
         )
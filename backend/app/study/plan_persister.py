@@ -8,14 +8,16 @@ centralizando toda a lógica de persistência de planos de estudo.
 """
 
 import time
-from typing import Dict
+from typing import Set
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
 from app.users.models import UserContest
 from app.contests.models import ProgrammaticContent
 from app.core.logging import get_logger, LogContext
 from app.study.ai_schemas import AIStudyPlanResponse
-from app.study.models import StudyRoadmapSession
+from app.study.models import StudyRoadmapSession, roadmap_session_topics
+from app.guided_lesson.models import MessageHistory
 
 
 class StudyPlanPersister:
@@ -45,7 +47,7 @@ class StudyPlanPersister:
         Raises:
             Exception: Se houver erro na persistência
         """
-        persistence_start = time.time()
+        persistence_start = time.perf_counter()
         
         with LogContext(phase="database_persistence", user_contest_id=user_contest.id) as phase_logger:
             phase_logger.info(
@@ -57,18 +59,18 @@ class StudyPlanPersister:
                 # Limpar roadmap anterior
                 deleted_count = self._clear_previous_roadmap(user_contest, phase_logger)
                 
-                # Preparar mapeamento de tópicos
-                topic_id_to_obj_map = self._build_topic_mapping(user_contest, phase_logger)
+                # Carregar os IDs de tópicos válidos do cargo
+                valid_topic_ids = self._load_valid_topic_ids(user_contest, phase_logger)
                 
                 # Criar novas sessões
                 sessions_created = self._create_new_sessions(
-                    user_contest, plan, topic_id_to_obj_map, phase_logger
+                    user_contest, plan, valid_topic_ids, phase_logger
                 )
                 
                 # Commit das mudanças
                 self.db.commit()
                 
-                persistence_duration = round((time.time() - persistence_start) * 1000, 2)
+                persistence_duration = round((time.perf_counter() - persistence_start) * 1000, 2)
                 
                 phase_logger.info(
                     "Database persistence phase completed",
@@ -100,9 +102,27 @@ class StudyPlanPersister:
         Returns:
             int: Número de sessões removidas
         """
-        deleted_count = self.db.query(StudyRoadmapSession).filter(
+        previous_session_ids = select(StudyRoadmapSession.id).where(
             StudyRoadmapSession.user_contest_id == user_contest.id
-        ).delete()
+        )
+        
+        # O DELETE em massa não passa pelos cascades do ORM: remove explicitamente os
+        # vínculos com tópicos e o histórico das aulas guiadas (bancos criados antes do
+        # ON DELETE CASCADE ainda rejeitariam a exclusão das sessões).
+        # Os checkpoints do LangGraph (thread guided_lesson_{session_id}) ficam no banco:
+        # os ids de sessão nunca são reutilizados, então nenhuma sessão nova retoma um
+        # thread antigo, e removê-los exigiria o pool do checkpointer fora desta transação.
+        self.db.execute(
+            delete(roadmap_session_topics).where(roadmap_session_topics.c.session_id.in_(previous_session_ids))
+        )
+        self.db.execute(
+            delete(MessageHistory).where(MessageHistory.session_id.in_(previous_session_ids))
+            .execution_options(synchronize_session=False)
+        )
+        deleted_count = self.db.execute(
+            delete(StudyRoadmapSession).where(StudyRoadmapSession.user_contest_id == user_contest.id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
         
         logger.info(
             "Cleared previous roadmap sessions",
@@ -111,35 +131,38 @@ class StudyPlanPersister:
         
         return deleted_count
         
-    def _build_topic_mapping(self, user_contest: UserContest, logger) -> Dict[int, ProgrammaticContent]:
+    def _load_valid_topic_ids(self, user_contest: UserContest, logger) -> Set[int]:
         """
-        Constrói mapeamento de IDs de tópicos para objetos do banco.
+        Carrega os IDs dos tópicos do cargo, usados para validar os IDs do plano.
+        
+        Apenas a coluna id é consultada: as associações são inseridas por ID,
+        sem necessidade de carregar os objetos ProgrammaticContent.
         
         Args:
             user_contest: Contest do usuário
             logger: Logger para registrar ação
             
         Returns:
-            Dict: Mapeamento id -> objeto ProgrammaticContent
+            Set[int]: IDs dos tópicos do cargo
         """
-        all_user_topics = self.db.query(ProgrammaticContent).filter(
-            ProgrammaticContent.contest_role_id == user_contest.contest_role_id
-        ).all()
-        
-        topic_id_to_obj_map = {topic.id: topic for topic in all_user_topics}
+        valid_topic_ids = set(self.db.scalars(
+            select(ProgrammaticContent.id).where(
+                ProgrammaticContent.contest_role_id == user_contest.contest_role_id
+            )
+        ))
         
         logger.info(
-            "Built topic ID mapping",
-            total_topics_available=len(topic_id_to_obj_map)
+            "Loaded valid topic IDs",
+            total_topics_available=len(valid_topic_ids)
         )
         
-        return topic_id_to_obj_map
+        return valid_topic_ids
         
     def _create_new_sessions(
         self,
         user_contest: UserContest,
         plan: AIStudyPlanResponse,
-        topic_id_to_obj_map: Dict[int, ProgrammaticContent],
+        valid_topic_ids: Set[int],
         logger
     ) -> int:
         """
@@ -148,13 +171,14 @@ class StudyPlanPersister:
         Args:
             user_contest: Contest do usuário
             plan: Plano organizado pela IA
-            topic_id_to_obj_map: Mapeamento de IDs para objetos de tópicos
+            valid_topic_ids: IDs dos tópicos existentes no cargo
             logger: Logger para registrar ação
             
         Returns:
             int: Número de sessões criadas
         """
-        new_sessions_to_add = []
+        session_rows = []
+        session_topic_ids = []
         skipped_sessions = 0
         
         for session_data in plan.roadmap:
@@ -168,25 +192,22 @@ class StudyPlanPersister:
                 )
                 continue
                 
-            # Criar nova sessão
-            new_session = StudyRoadmapSession(
-                user_contest_id=user_contest.id,
-                session_number=session_data.session_number,
-                summary=session_data.summary,
-                priority_level=session_data.priority_level,
-                priority_reason=session_data.priority_reason
-            )
-            
-            # Associar tópicos existentes
+            # Manter apenas tópicos existentes (sem repetições, preservando a ordem)
             topics_in_session = [
-                topic_id_to_obj_map.get(tid) 
-                for tid in topic_ids_list 
-                if tid in topic_id_to_obj_map
+                tid 
+                for tid in dict.fromkeys(topic_ids_list) 
+                if tid in valid_topic_ids
             ]
             
             if topics_in_session:
-                new_session.topics = topics_in_session
-                new_sessions_to_add.append(new_session)
+                session_rows.append({
+                    "user_contest_id": user_contest.id,
+                    "session_number": session_data.session_number,
+                    "summary": session_data.summary,
+                    "priority_level": session_data.priority_level,
+                    "priority_reason": session_data.priority_reason,
+                })
+                session_topic_ids.append(topics_in_session)
             else:
                 skipped_sessions += 1
                 logger.warning(
@@ -195,13 +216,25 @@ class StudyPlanPersister:
                     invalid_topic_ids=topic_ids_list
                 )
                 
-        # Adicionar todas as sessões ao banco
-        self.db.add_all(new_sessions_to_add)
+        if session_rows:
+            # Inserção em lote: um INSERT ... RETURNING para as sessões e outro para a
+            # tabela de associação, em vez de um INSERT por sessão e por tópico no flush
+            new_session_ids = self.db.execute(
+                insert(StudyRoadmapSession).returning(StudyRoadmapSession.id, sort_by_parameter_order=True),
+                session_rows
+            ).scalars().all()
+            
+            association_rows = [
+                {"session_id": session_id, "topic_id": topic_id}
+                for session_id, topic_ids in zip(new_session_ids, session_topic_ids)
+                for topic_id in topic_ids
+            ]
+            self.db.execute(insert(roadmap_session_topics), association_rows)
         
         logger.info(
             "Created new roadmap sessions",
-            sessions_created=len(new_sessions_to_add),
+            sessions_created=len(session_rows),
             sessions_skipped=skipped_sessions
         )
         
-        return len(new_sessions_to_add)
+        return len(session_rows)
@@ -1,11 +1,10 @@
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, insert, literal, select
 from fastapi import HTTPException, status
 from app.users.models import User, UserContest, UserTopicProgress
 from app.contests.models import ContestRole, ProgrammaticContent, PublishedContest, ContestStatus
-from app.core.settings import settings
-from app.core.ai_service import LangChainService
+from app.core.ai_service import get_langchain_service
 from .schemas import ProficiencySubmission, SessionCompletionRequest, LayoutGenerationRequest
 from .ui_schemas import ProceduralLayout
 from app.users.models import AssessmentType, ProficiencyHistory
@@ -39,14 +38,30 @@ def subscribe_user_to_role(db: Session, user: User, role_id: int):
     db.add(new_user_contest)
     db.flush()
 
-    for topic in role.programmatic_content:
-        progress = UserTopicProgress(
-            user_contest_id=new_user_contest.id,
-            programmatic_content_id=topic.id,
-            current_proficiency_score=0.0
+    # Cria o progresso de todos os tópicos do cargo em uma única instrução (INSERT ... SELECT).
+    # O NOT EXISTS torna a operação idempotente sem depender da constraint
+    # uq_user_topic_progress_contest_topic, ausente em bancos criados antes dela
+    # (ver docs/sql/user_topic_progress_unique.sql).
+    existing_progress = select(UserTopicProgress.id).where(
+        UserTopicProgress.user_contest_id == new_user_contest.id,
+        UserTopicProgress.programmatic_content_id == ProgrammaticContent.id,
+    )
+    topics_of_role = select(
+        literal(new_user_contest.id),
+        ProgrammaticContent.id,
+        literal(0.0),
+    ).where(
+        ProgrammaticContent.contest_role_id == role_id,
+        ~existing_progress.exists(),
+    )
+
+    db.execute(
+        insert(UserTopicProgress).from_select(
+            ["user_contest_id", "programmatic_content_id", "current_proficiency_score"],
+            topics_of_role,
         )
-        db.add(progress)
-    
+    )
+
     db.commit()
     db.refresh(new_user_contest)
     return new_user_contest
@@ -136,15 +151,16 @@ def update_user_proficiency_by_subject(db: Session, user: User, user_contest_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subscription not found")
 
     # VALIDAÇÃO: Verificar se já existe SELF_ASSESSMENT para esta inscrição
-    existing_self_assessment = (
-        db.query(ProficiencyHistory)
+    # EXISTS: só precisamos saber se há registro, sem materializar a linha no ORM
+    existing_self_assessment = db.query(
+        db.query(ProficiencyHistory.id)
         .join(UserTopicProgress, ProficiencyHistory.user_topic_progress_id == UserTopicProgress.id)
         .filter(
             UserTopicProgress.user_contest_id == user_contest_id,
             ProficiencyHistory.assessment_type == AssessmentType.SELF_ASSESSMENT
         )
-        .first()
-    )
+        .exists()
+    ).scalar()
 
     if existing_self_assessment:
         raise HTTPException(
@@ -176,7 +192,11 @@ def update_user_proficiency_by_subject(db: Session, user: User, user_contest_id:
     return {"status": "success", "message": "Proficiency updated and history recorded."}
 
 def generate_study_plan(db: Session, user: User, user_contest_id: int):
-    user_contest = db.query(UserContest).filter(
+    # O pipeline lê role.contest (nome e data da prova) em várias etapas;
+    # carregá-los junto evita as consultas lazy adicionais
+    user_contest = db.query(UserContest).options(
+        joinedload(UserContest.role).joinedload(ContestRole.contest)
+    ).filter(
         UserContest.id == user_contest_id, UserContest.user_id == user.id
     ).first()
 
@@ -290,37 +310,46 @@ def complete_study_session(db: Session, user: User, user_contest_id: int, comple
     if not main_session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Main session not found in roadmap.")
 
-    for topic in main_session.topics:
-        progress = db.query(UserTopicProgress).filter(
-            UserTopicProgress.user_contest_id == user_contest_id,
-            UserTopicProgress.programmatic_content_id == topic.id
+    review_session = None
+    if completion_data.review_session_id:
+        review_session = db.query(StudyRoadmapSession).options(joinedload(StudyRoadmapSession.topics)).filter(
+            StudyRoadmapSession.id == completion_data.review_session_id,
+            StudyRoadmapSession.user_contest_id == user_contest_id
         ).first()
+
+    # Carrega o progresso de todos os tópicos envolvidos em uma única consulta (IN),
+    # em vez de uma consulta por tópico
+    topic_ids = {topic.id for topic in main_session.topics}
+    if review_session:
+        topic_ids.update(topic.id for topic in review_session.topics)
+
+    progress_by_topic = {
+        progress.programmatic_content_id: progress
+        for progress in db.query(UserTopicProgress).filter(
+            UserTopicProgress.user_contest_id == user_contest_id,
+            UserTopicProgress.programmatic_content_id.in_(topic_ids)
+        ).all()
+    }
+
+    for topic in main_session.topics:
+        progress = progress_by_topic.get(topic.id)
         
         if progress:
             progress.sessions_studied += 1
             progress.last_studied_at = now
             progress.next_review_at = now + timedelta(days=SPACED_REPETITION_INTERVALS[0])
 
-    if completion_data.review_session_id:
-        review_session = db.query(StudyRoadmapSession).options(joinedload(StudyRoadmapSession.topics)).filter(
-            StudyRoadmapSession.id == completion_data.review_session_id,
-            StudyRoadmapSession.user_contest_id == user_contest_id
-        ).first()
+    if review_session:
+        for topic in review_session.topics:
+            review_progress = progress_by_topic.get(topic.id)
 
-        if review_session:
-            for topic in review_session.topics:
-                review_progress = db.query(UserTopicProgress).filter(
-                    UserTopicProgress.user_contest_id == user_contest_id,
-                    UserTopicProgress.programmatic_content_id == topic.id
-                ).first()
-
-                if review_progress:
-                    current_interval_index = (review_progress.sessions_studied - 1) % len(SPACED_REPETITION_INTERVALS)
-                    next_interval_index = min(current_interval_index + 1, len(SPACED_REPETITION_INTERVALS) - 1)
-                    days_for_next_review = SPACED_REPETITION_INTERVALS[next_interval_index]
-                    
-                    review_progress.next_review_at = now + timedelta(days=days_for_next_review)
-                    review_progress.sessions_studied += 1
+            if review_progress:
+                current_interval_index = (review_progress.sessions_studied - 1) % len(SPACED_REPETITION_INTERVALS)
+                next_interval_index = min(current_interval_index + 1, len(SPACED_REPETITION_INTERVALS) - 1)
+                days_for_next_review = SPACED_REPETITION_INTERVALS[next_interval_index]
+                
+                review_progress.next_review_at = now + timedelta(days=days_for_next_review)
+                review_progress.sessions_studied += 1
 
     db.commit()
     return {"status": "success", "message": "Session completed and progress updated."}
@@ -337,11 +366,7 @@ def generate_procedural_layout(db: Session, request: LayoutGenerationRequest):
 
     prompt_input = {"topics_list_str": topics_list_str}
 
-    ai_service = LangChainService(
-        provider="google",
-        api_key=settings.GEMINI_API_KEY,
-        model_name="gemini-2.5-pro"
-    )
+    ai_service = get_langchain_service(model_name="gemini-2.5-pro")
     
     ai_response_obj = ai_service.generate_structured_output(
         prompt_template=procedural_layout_prompt,
@@ -387,11 +412,7 @@ def get_or_generate_layout(db: Session, user: User, session_id: int):
     topics_list_str = "\n- ".join(topic_names)
     prompt_input = {"topics_list_str": topics_list_str}
 
-    ai_service = LangChainService(
-        provider="google",
-        api_key=settings.GEMINI_API_KEY,
-        model_name="gemini-2.5-pro"
-    )
+    ai_service = get_langchain_service(model_name="gemini-2.5-pro")
     
     ai_response_obj = ai_service.generate_structured_output(
         prompt_template=procedural_layout_prompt,
@@ -4,10 +4,11 @@
 StudyTopicAnalyzer: Responsável pela análise de tópicos via IA.
 """
 
-import json
 import time
 from typing import List
 
+import orjson
+
 from app.core.ai_service import LangChainService
 from app.core.constants import AIConstants
 from app.core.logging import get_logger, LogContext
@@ -23,9 +24,12 @@ class StudyTopicAnalyzer:
         self.logger = get_logger("study.topic_analyzer")
         
     def analyze_topics(self, topics_data: TopicsData, user_contest_id: int) -> AITopicAnalysisResponse:
-        analysis_start = time.time()
+        analysis_start = time.perf_counter()
         with LogContext(phase="topic_analysis", user_contest_id=user_contest_id) as phase_logger:
-            prompt_input = {"topics_json": json.dumps(topics_data.topics_data_for_ai, indent=2)}
+            # orjson: a lista de tópicos pode ter dezenas de KB e contém apenas tipos nativos do JSON.
+            # Sem indentação: os espaços só aumentariam os tokens de entrada enviados ao modelo
+            topics_json = orjson.dumps(topics_data.topics_data_for_ai).decode()
+            prompt_input = {"topics_json": topics_json}
             ai_response_obj = self._invoke_ai_with_validation(
                 prompt_input=prompt_input,
                 topics_data=topics_data,
@@ -33,7 +37,7 @@ class StudyTopicAnalyzer:
             )
             phase_logger.info(
                 "Topic analysis phase completed",
-                duration_ms=round((time.time() - analysis_start) * 1000, 2),
+                duration_ms=round((time.perf_counter() - analysis_start) * 1000, 2),
                 analyzed_topics_count=len(ai_response_obj.analyzed_topics),
             )
             return ai_response_obj
@@ -42,18 +46,30 @@ class StudyTopicAnalyzer:
         from app.study.ai_validation_service import AIValidationService
         validation_service = AIValidationService(ai_service=self.ai_service, max_retries=AIConstants.MAX_RETRIES_AI_VALIDATION)
 
+        input_topic_ids = {topic['topic_id'] for topic in topics_data.topics_data_for_ai}
+
         def validate_analysis_response(response: AITopicAnalysisResponse) -> List[str]:
-            input_topic_ids = {topic['topic_id'] for topic in topics_data.topics_data_for_ai}
             return ValidationOrchestrator.validate_analysis_phase_output(
                 analysis_response=response,
                 input_topic_ids=input_topic_ids,
                 user_contest_id=user_contest_id,
             )
 
+        def repair_analysis(response: AITopicAnalysisResponse) -> AITopicAnalysisResponse:
+            # Tópicos inventados podem ser descartados sem nova chamada; estimativas fora da
+            # faixa e tópicos ausentes seguem para a validação e exigem nova tentativa
+            return response.model_copy(update={
+                "analyzed_topics": [
+                    analysis for analysis in response.analyzed_topics
+                    if analysis.topic_id in input_topic_ids
+                ]
+            })
+
         return validation_service.invoke_with_validation(
             prompt_template=topic_analysis_prompt,
             prompt_input=prompt_input,
             response_schema=AITopicAnalysisResponse,
             validation_function=validate_analysis_response,
             context={"phase": "topic_analysis", "user_contest_id": user_contest_id},
+            repair_function=repair_analysis,
         )
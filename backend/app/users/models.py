@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLAlchemyEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLAlchemyEnum, DateTime, UniqueConstraint
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
@@ -35,6 +35,10 @@ class AssessmentType(str, enum.Enum):
 
 class UserTopicProgress(Base):
     __tablename__ = "user_topic_progress"
+    __table_args__ = (
+        # Um único registro de progresso por tópico em cada inscrição
+        UniqueConstraint("user_contest_id", "programmatic_content_id", name="uq_user_topic_progress_contest_topic"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     current_proficiency_score = Column(Float, default=0.0)
@@ -60,7 +64,7 @@ class ProficiencyHistory(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # CHAVE ESTRANGEIRA: Link para a tabela de progresso do tópico
-    user_topic_progress_id = Column(Integer, ForeignKey("user_topic_progress.id"))
+    user_topic_progress_id = Column(Integer, ForeignKey("user_topic_progress.id"), index=True)
     
     # RELACIONAMENTO
     topic_progress = relationship("UserTopicProgress", back_populates="history")
\ No newline at end of file
@@ -0,0 +1,12 @@
+-- Cria o índice ix_message_history_session_timestamp (session_id, timestamp) em bancos
+-- criados antes dele. O create_all não altera tabelas existentes.
+--
+-- O histórico da aula guiada filtra message_history por session_id e ordena por timestamp;
+-- sem o índice, cada leitura percorre e ordena a tabela inteira.
+--
+-- CREATE INDEX CONCURRENTLY não bloqueia escritas, mas não pode rodar dentro de uma
+-- transação. Executar uma única vez, sem BEGIN/COMMIT:
+--   psql "$DATABASE_URL" -f docs/sql/message_history_session_timestamp_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_message_history_session_timestamp
+    ON message_history (session_id, timestamp);
@@ -0,0 +1,13 @@
+-- Cria o índice ix_proficiency_history_user_topic_progress_id em bancos criados antes dele.
+-- O create_all não altera tabelas existentes.
+--
+-- A verificação de autoavaliação existente e a consulta de autoavaliações pendentes juntam
+-- proficiency_history a user_topic_progress por user_topic_progress_id; sem o índice, cada
+-- uma percorre a tabela de histórico inteira.
+--
+-- CREATE INDEX CONCURRENTLY não bloqueia escritas, mas não pode rodar dentro de uma
+-- transação. Executar uma única vez, sem BEGIN/COMMIT:
+--   psql "$DATABASE_URL" -f docs/sql/proficiency_history_topic_progress_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_proficiency_history_user_topic_progress_id
+    ON proficiency_history (user_topic_progress_id);
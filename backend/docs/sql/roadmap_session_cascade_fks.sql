@@ -0,0 +1,28 @@
+-- Recria com ON DELETE CASCADE as chaves estrangeiras session_id que apontam para
+-- study_roadmap_sessions, em bancos criados antes da mudança. O create_all não altera
+-- tabelas existentes.
+--
+--   roadmap_session_topics.session_id -> study_roadmap_sessions.id
+--   message_history.session_id        -> study_roadmap_sessions.id
+--
+-- Os nomes abaixo são os gerados pelo Postgres no create_all (<tabela>_<coluna>_fkey).
+-- Confira com \d roadmap_session_topics e \d message_history antes de executar.
+--
+-- Executar uma única vez, com a aplicação parada:
+--   psql "$DATABASE_URL" -f docs/sql/roadmap_session_cascade_fks.sql
+
+BEGIN;
+
+ALTER TABLE roadmap_session_topics
+    DROP CONSTRAINT IF EXISTS roadmap_session_topics_session_id_fkey;
+ALTER TABLE roadmap_session_topics
+    ADD CONSTRAINT roadmap_session_topics_session_id_fkey
+    FOREIGN KEY (session_id) REFERENCES study_roadmap_sessions (id) ON DELETE CASCADE;
+
+ALTER TABLE message_history
+    DROP CONSTRAINT IF EXISTS message_history_session_id_fkey;
+ALTER TABLE message_history
+    ADD CONSTRAINT message_history_session_id_fkey
+    FOREIGN KEY (session_id) REFERENCES study_roadmap_sessions (id) ON DELETE CASCADE;
+
+COMMIT;
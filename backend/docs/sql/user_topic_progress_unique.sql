@@ -0,0 +1,35 @@
+-- Adiciona a constraint uq_user_topic_progress_contest_topic (um progresso por tópico em
+-- cada inscrição) a bancos criados antes dela. O create_all não altera tabelas existentes.
+--
+-- Antes de criar a constraint, remove progressos duplicados mantendo o registro mais antigo
+-- (menor id) de cada par (user_contest_id, programmatic_content_id). O histórico de
+-- proficiência dos duplicados é removido junto, pois referencia o progresso descartado.
+--
+-- Executar uma única vez, com a aplicação parada:
+--   psql "$DATABASE_URL" -f docs/sql/user_topic_progress_unique.sql
+
+BEGIN;
+
+CREATE TEMP TABLE duplicated_progress ON COMMIT DROP AS
+SELECT id
+FROM (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY user_contest_id, programmatic_content_id
+               ORDER BY id
+           ) AS position
+    FROM user_topic_progress
+) ranked
+WHERE position > 1;
+
+DELETE FROM proficiency_history
+WHERE user_topic_progress_id IN (SELECT id FROM duplicated_progress);
+
+DELETE FROM user_topic_progress
+WHERE id IN (SELECT id FROM duplicated_progress);
+
+ALTER TABLE user_topic_progress
+    ADD CONSTRAINT uq_user_topic_progress_contest_topic
+    UNIQUE (user_contest_id, programmatic_content_id);
+
+COMMIT;
@@ -26,8 +26,8 @@ def test_edict_processor_happy_path(mocker):
     mock_client.return_value.bucket.return_value = mock_bucket
 
     # Mock AI service methods
-    mocker.patch("app.contests.edict_processor.LangChainService.generate_structured_output_from_content", return_value=types.SimpleNamespace(dict=lambda: {"contest_roles": []}))
-    mocker.patch("app.contests.edict_processor.LangChainService.generate_structured_output", return_value=types.SimpleNamespace(dict=lambda: {"contest_roles": []}))
+    mocker.patch("app.contests.edict_processor.LangChainService.generate_structured_output_from_content", return_value=types.SimpleNamespace(model_dump=lambda: {"contest_roles": []}))
+    mocker.patch("app.contests.edict_processor.LangChainService.generate_structured_output", return_value=types.SimpleNamespace(model_dump=lambda: {"contest_roles": []}))
 
     # Mock persistence
     mock_save = mocker.patch("app.contests.edict_processor.crud.save_structured_edict_data")
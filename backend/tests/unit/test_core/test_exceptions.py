@@ -20,6 +20,7 @@ from app.core.exceptions import (
     AIValidationError,
     GeminiAPIError,
     MaxRetriesExceededError,
+    AIServiceBusyError,
     BusinessLogicError,
     ExamDatePassedError,
     NoTopicsAvailableError,
@@ -97,6 +98,11 @@ class TestExceptionHierarchy:
         assert retry_exc.error_code == "MAX_RETRIES_EXCEEDED"
         assert retry_exc.details["operation"] == "PDF extraction"
         assert retry_exc.details["max_retries"] == 3
+
+        busy_exc = AIServiceBusyError(60)
+        assert isinstance(busy_exc, AIProcessingError)
+        assert busy_exc.error_code == "AI_SERVICE_BUSY"
+        assert busy_exc.details["wait_seconds"] == 60
     
     def test_business_logic_error_hierarchy(self):
         """Testa hierarquia de erros de regras de negócio"""
@@ -134,6 +140,7 @@ class TestStatusCodeMapping:
         assert get_status_code_for_exception(GeminiAPIError("error", 0)) == 503
         assert get_status_code_for_exception(AIValidationError(["error"])) == 503
         assert get_status_code_for_exception(MaxRetriesExceededError("op", 3)) == 503
+        assert get_status_code_for_exception(AIServiceBusyError(60)) == 503
     
     def test_generic_error_status(self):
         """Testa status 500 para erro genérico"""
@@ -0,0 +1,21 @@
+# backend/tests/unit/test_core/test_logging.py
+
+from app.core.logging import filter_sensitive_data
+
+
+def test_filter_sensitive_data_redacts_matching_keys_recursively():
+    event = {
+        "event": "login",
+        "Password": "123",
+        "access_token": "abc",
+        "payload": {"GEMINI_API_KEY": "k", "user": "joao"},
+        "items": [{"client_secret": "s", "count": 2}],
+    }
+
+    cleaned = filter_sensitive_data(None, "info", event)
+
+    assert cleaned["event"] == "login"
+    assert cleaned["Password"] == "[REDACTED]"
+    assert cleaned["access_token"] == "[REDACTED]"
+    assert cleaned["payload"] == {"GEMINI_API_KEY": "[REDACTED]", "user": "joao"}
+    assert cleaned["items"] == [{"client_secret": "[REDACTED]", "count": 2}]
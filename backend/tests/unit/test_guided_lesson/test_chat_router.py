@@ -0,0 +1,100 @@
+# backend/tests/unit/test_guided_lesson/test_chat_router.py
+
+import importlib
+import sys
+import types
+from contextlib import nullcontext
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.exceptions import AIServiceBusyError
+from app.guided_lesson import models
+
+
+@pytest.fixture
+def router(monkeypatch):
+    # agents.py abre o pool do checkpointer (Postgres) na importação: substitui o módulo
+    fake_agents = types.ModuleType("app.guided_lesson.agents")
+    fake_agents.get_study_session_agent = MagicMock()
+    fake_agents.agent_call_slot = MagicMock(side_effect=nullcontext)
+    fake_agents.LessonSessionContext = MagicMock()
+    monkeypatch.setitem(sys.modules, "app.guided_lesson.agents", fake_agents)
+    monkeypatch.delitem(sys.modules, "app.guided_lesson.router", raising=False)
+    router_module = importlib.import_module("app.guided_lesson.router")
+    monkeypatch.setattr(router_module.crud, "user_owns_session", MagicMock(return_value=True))
+    yield router_module
+    sys.modules.pop("app.guided_lesson.router", None)
+
+
+def _chat_request(content="Pode explicar de novo?"):
+    return types.SimpleNamespace(content=content, session_contents=types.SimpleNamespace(topics=[]))
+
+
+def test_user_message_is_saved_when_agent_fails(router, mocker):
+    router.get_study_session_agent.return_value.invoke.side_effect = RuntimeError("Gemini indisponível")
+    add_message = mocker.patch.object(router.crud, "add_message_to_history")
+    add_turn = mocker.patch.object(router.crud, "add_chat_turn_to_history")
+    user = types.SimpleNamespace(id=7)
+
+    with pytest.raises(RuntimeError):
+        router.handle_chat_message(session_id=1, request=_chat_request(), db=MagicMock(), current_user=user)
+
+    add_message.assert_called_once()
+    assert add_message.call_args.kwargs["sender_type"] == models.SenderType.USER
+    assert add_message.call_args.kwargs["content"] == "Pode explicar de novo?"
+    add_turn.assert_not_called()
+
+
+def test_user_message_is_saved_when_no_agent_slot_is_available(router, mocker):
+    router.agent_call_slot.side_effect = AIServiceBusyError(wait_seconds=60)
+    add_message = mocker.patch.object(router.crud, "add_message_to_history")
+    user = types.SimpleNamespace(id=7)
+
+    with pytest.raises(AIServiceBusyError):
+        router.handle_chat_message(session_id=1, request=_chat_request(), db=MagicMock(), current_user=user)
+
+    router.get_study_session_agent.return_value.invoke.assert_not_called()
+    add_message.assert_called_once()
+
+
+def test_successful_turn_is_saved_in_one_write(router, mocker):
+    router.get_study_session_agent.return_value.invoke.return_value = {
+        "messages": [types.SimpleNamespace(content="Claro!")]
+    }
+    add_message = mocker.patch.object(router.crud, "add_message_to_history")
+    add_turn = mocker.patch.object(router.crud, "add_chat_turn_to_history")
+    user = types.SimpleNamespace(id=7)
+
+    response = router.handle_chat_message(
+        session_id=1, request=_chat_request(), include_history=False, db=MagicMock(), current_user=user
+    )
+
+    assert response["history"] == []
+    add_turn.assert_called_once()
+    add_message.assert_not_called()
+
+
+def test_chat_on_session_of_another_user_returns_404(router, mocker):
+    router.crud.user_owns_session.return_value = False
+    add_message = mocker.patch.object(router.crud, "add_message_to_history")
+    user = types.SimpleNamespace(id=7)
+
+    with pytest.raises(HTTPException) as exc_info:
+        router.handle_chat_message(session_id=1, request=_chat_request(), db=MagicMock(), current_user=user)
+
+    assert exc_info.value.status_code == 404
+    router.get_study_session_agent.return_value.invoke.assert_not_called()
+    add_message.assert_not_called()
+
+
+def test_start_on_session_of_another_user_returns_404(router):
+    router.crud.user_owns_session.return_value = False
+    request = types.SimpleNamespace(session_id=1, topics=[])
+
+    with pytest.raises(HTTPException) as exc_info:
+        router.start_guided_lesson(request=request, db=MagicMock(), current_user=types.SimpleNamespace(id=7))
+
+    assert exc_info.value.status_code == 404
+    router.get_study_session_agent.return_value.invoke.assert_not_called()
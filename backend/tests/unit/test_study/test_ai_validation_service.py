@@ -0,0 +1,147 @@
+# backend/tests/unit/test_study/test_ai_validation_service.py
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.study.ai_schemas import AIStudyPlanResponse, AIRoadmapSession, AITopicAnalysis, AITopicAnalysisResponse
+from app.study.ai_validation_service import AIValidationService
+from app.study.data_collector import TopicsData
+from app.study.plan_organizer import StudyPlanOrganizer
+from app.study.topic_analyzer import StudyTopicAnalyzer
+
+
+PROMPT = "Organize os tópicos: {topics}"
+
+
+def _plan(*topic_ids_per_session):
+    return AIStudyPlanResponse(roadmap=[
+        AIRoadmapSession(session_number=i, topic_ids=list(ids), summary="s", priority_level="Alta Prioridade", priority_reason="r")
+        for i, ids in enumerate(topic_ids_per_session, start=1)
+    ])
+
+
+def _validate_ids(expected):
+    def validate(response):
+        planned = {tid for session in response.roadmap for tid in session.topic_ids}
+        return [] if planned == expected else [f"IDs inválidos: {planned ^ expected}"]
+    return validate
+
+
+def _drop_invented(expected):
+    def repair(response):
+        return response.model_copy(update={"roadmap": [
+            s.model_copy(update={"topic_ids": [t for t in s.topic_ids if t in expected]}) for s in response.roadmap
+        ]})
+    return repair
+
+
+def test_repair_function_avoids_new_ai_call_when_it_fixes_the_response():
+    ai_service = MagicMock()
+    ai_service.invoke_with_history.return_value = _plan([1, 99], [2])
+    service = AIValidationService(ai_service=ai_service, max_retries=2)
+
+    result = service.invoke_with_validation(
+        prompt_template=PROMPT,
+        prompt_input={"topics": "[1, 2]"},
+        response_schema=AIStudyPlanResponse,
+        validation_function=_validate_ids({1, 2}),
+        repair_function=_drop_invented({1, 2}),
+    )
+
+    assert ai_service.invoke_with_history.call_count == 1
+    assert [s.topic_ids for s in result.roadmap] == [[1], [2]]
+
+
+def test_falls_back_to_ai_correction_when_repair_is_not_enough():
+    ai_service = MagicMock()
+    # Primeira resposta omite o tópico 2 (não corrigível localmente); a segunda está correta
+    ai_service.invoke_with_history.side_effect = [_plan([1, 99]), _plan([1], [2])]
+    service = AIValidationService(ai_service=ai_service, max_retries=2)
+
+    result = service.invoke_with_validation(
+        prompt_template=PROMPT,
+        prompt_input={"topics": "[1, 2]"},
+        response_schema=AIStudyPlanResponse,
+        validation_function=_validate_ids({1, 2}),
+        repair_function=_drop_invented({1, 2}),
+    )
+
+    assert ai_service.invoke_with_history.call_count == 2
+    assert [s.topic_ids for s in result.roadmap] == [[1], [2]]
+
+
+def test_raises_after_max_retries_without_repair_function():
+    ai_service = MagicMock()
+    ai_service.invoke_with_history.return_value = _plan([1, 99])
+    service = AIValidationService(ai_service=ai_service, max_retries=1)
+
+    with pytest.raises(ValueError):
+        service.invoke_with_validation(
+            prompt_template=PROMPT,
+            prompt_input={"topics": "[1]"},
+            response_schema=AIStudyPlanResponse,
+            validation_function=_validate_ids({1}),
+        )
+    assert ai_service.invoke_with_history.call_count == 2
+
+
+def test_retries_send_only_the_latest_correction():
+    ai_service = MagicMock()
+    ai_service.invoke_with_history.side_effect = [_plan([99]), _plan([98]), _plan([1])]
+    service = AIValidationService(ai_service=ai_service, max_retries=2)
+
+    service.invoke_with_validation(
+        prompt_template=PROMPT,
+        prompt_input={"topics": "[1]"},
+        response_schema=AIStudyPlanResponse,
+        validation_function=_validate_ids({1}),
+    )
+
+    sent = [call.kwargs["messages"] for call in ai_service.invoke_with_history.call_args_list]
+    # Prompt original + apenas a correção da tentativa anterior
+    assert [len(messages) for messages in sent] == [1, 2, 2]
+    assert "98" in sent[2][-1].content and "99" not in sent[2][-1].content
+
+
+def test_organizer_repair_drops_sessions_left_empty_and_renumbers():
+    ai_service = MagicMock()
+    # A sessão 2 só tem um tópico inventado: após o reparo ficaria vazia
+    ai_service.invoke_with_history.return_value = _plan([1, 99], [98], [2])
+    organizer = StudyPlanOrganizer(ai_service=ai_service)
+
+    result = organizer._invoke_ai_with_validation(
+        prompt_input={"total_sessions": 10, "analyzed_topics_json": "[]"},
+        total_sessions=10,
+        input_topic_ids={1, 2},
+        user_contest_id=1,
+    )
+
+    assert ai_service.invoke_with_history.call_count == 1
+    assert [(s.session_number, s.topic_ids) for s in result.roadmap] == [(1, [1]), (2, [2])]
+
+
+def test_analyzer_retries_out_of_range_session_estimates():
+    ai_service = MagicMock()
+    ai_service.invoke_with_history.side_effect = [
+        AITopicAnalysisResponse(analyzed_topics=[
+            AITopicAnalysis(topic_id=1, priority_level="Alta Prioridade", estimated_sessions=0, prerequisite_topic_ids=[]),
+            AITopicAnalysis(topic_id=2, priority_level="Baixa Prioridade", estimated_sessions=50, prerequisite_topic_ids=[]),
+        ]),
+        AITopicAnalysisResponse(analyzed_topics=[
+            AITopicAnalysis(topic_id=1, priority_level="Alta Prioridade", estimated_sessions=1, prerequisite_topic_ids=[]),
+            AITopicAnalysis(topic_id=2, priority_level="Baixa Prioridade", estimated_sessions=10, prerequisite_topic_ids=[]),
+        ]),
+    ]
+    analyzer = StudyTopicAnalyzer(ai_service=ai_service)
+    topics_data = TopicsData(total_sessions=10, topics_data_for_ai=[{"topic_id": 1}, {"topic_id": 2}])
+
+    result = analyzer._invoke_ai_with_validation(
+        prompt_input={"topics_json": "[]"}, topics_data=topics_data, user_contest_id=1
+    )
+
+    # A estimativa fora da faixa não é ajustada em silêncio: a validação pede correção à IA
+    assert ai_service.invoke_with_history.call_count == 2
+    correction = ai_service.invoke_with_history.call_args_list[1].kwargs["messages"][-1].content
+    assert "Sessões inválidas (0)" in correction and "Sessões inválidas (50)" in correction
+    assert [a.estimated_sessions for a in result.analyzed_topics] == [1, 10]
@@ -0,0 +1,76 @@
+# backend/tests/unit/test_study/test_plan_persister.py
+
+import types
+from unittest.mock import MagicMock
+
+from app.study.ai_schemas import AIStudyPlanResponse, AIRoadmapSession
+from app.study.plan_persister import StudyPlanPersister
+
+
+def _session(number, topic_ids):
+    return AIRoadmapSession(
+        session_number=number, topic_ids=topic_ids, summary="s", priority_level="Alta Prioridade", priority_reason="r"
+    )
+
+
+def test_create_new_sessions_bulk_inserts_sessions_and_topic_links():
+    db = MagicMock()
+    db.execute.return_value.scalars.return_value.all.return_value = [100, 101]
+    persister = StudyPlanPersister(db)
+    user_contest = types.SimpleNamespace(id=1, contest_role_id=10)
+    plan = AIStudyPlanResponse(roadmap=[
+        _session(1, [1, 2]),
+        _session(2, []),        # sem tópicos: ignorada
+        _session(3, [99]),      # tópico inexistente: ignorada
+        _session(4, [2, 2, 3]), # tópico repetido: associado uma única vez
+    ])
+
+    created = persister._create_new_sessions(user_contest, plan, {1, 2, 3}, MagicMock())
+
+    assert created == 2
+    # Um INSERT para as sessões e outro para a tabela de associação
+    assert db.execute.call_count == 2
+    session_rows = db.execute.call_args_list[0].args[1]
+    assert [row["session_number"] for row in session_rows] == [1, 4]
+    assert all(row["user_contest_id"] == 1 for row in session_rows)
+    association_rows = db.execute.call_args_list[1].args[1]
+    assert association_rows == [
+        {"session_id": 100, "topic_id": 1},
+        {"session_id": 100, "topic_id": 2},
+        {"session_id": 101, "topic_id": 2},
+        {"session_id": 101, "topic_id": 3},
+    ]
+
+
+def test_create_new_sessions_skips_insert_when_no_valid_session():
+    db = MagicMock()
+    persister = StudyPlanPersister(db)
+    user_contest = types.SimpleNamespace(id=1, contest_role_id=10)
+    plan = AIStudyPlanResponse(roadmap=[_session(1, [])])
+
+    assert persister._create_new_sessions(user_contest, plan, {1}, MagicMock()) == 0
+    db.execute.assert_not_called()
+
+
+def test_clear_previous_roadmap_deletes_dependents_before_sessions():
+    db = MagicMock()
+    db.execute.return_value.rowcount = 3
+    persister = StudyPlanPersister(db)
+    user_contest = types.SimpleNamespace(id=1, contest_role_id=10)
+
+    assert persister._clear_previous_roadmap(user_contest, MagicMock()) == 3
+    # Vínculos com tópicos, histórico das aulas e, por último, as sessões
+    deleted_tables = [call.args[0].table.name for call in db.execute.call_args_list]
+    assert deleted_tables == ["roadmap_session_topics", "message_history", "study_roadmap_sessions"]
+
+
+def test_load_valid_topic_ids_returns_id_set():
+    db = MagicMock()
+    db.scalars.return_value = iter([1, 2, 3])
+    persister = StudyPlanPersister(db)
+    user_contest = types.SimpleNamespace(id=1, contest_role_id=10)
+
+    assert persister._load_valid_topic_ids(user_contest, MagicMock()) == {1, 2, 3}
+    # Apenas a coluna id é selecionada
+    statement = db.scalars.call_args.args[0]
+    assert [column.name for column in statement.selected_columns] == ["id"]
@@ -196,7 +196,8 @@ export default function GuidedLessonPage() {
     setIsSendingMessage(true);
 
     try {
-      const response = await fetch(`${apiUrl}/guided-lesson/${guidedLessonSessionId}/chat`, {
+      // The conversation is already kept locally, so skip re-downloading the full history each turn
+      const response = await fetch(`${apiUrl}/guided-lesson/${guidedLessonSessionId}/chat?include_history=false`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -214,26 +215,23 @@ export default function GuidedLessonPage() {
       }
 
       const data = await response.json();
-      setChatHistory(data.history.map((msg: any) => {
-        let content = msg.content;
-        if (msg.sender_type === 'AI') {
-          try {
-            const parsed = JSON.parse(msg.content);
-            if (parsed && typeof parsed === 'object' && parsed.text) {
-              content = parsed.text;
-            } else if (typeof parsed === 'string') {
-              content = parsed;
-            }
-          } catch (e) {
-            // Not a JSON string, use content as is
-          }
+      let agentContent = data.agent_response;
+      try {
+        const parsed = JSON.parse(data.agent_response);
+        if (parsed && typeof parsed === 'object' && parsed.text) {
+          agentContent = parsed.text;
+        } else if (typeof parsed === 'string') {
+          agentContent = parsed;
         }
-        return {
-          sender_type: msg.sender_type,
-          content: content,
-          timestamp: msg.timestamp,
-        };
-      }));
+      } catch (e) {
+        // Not a JSON string, use content as is
+      }
+      const agentMessage: Message = {
+        sender_type: 'AI',
+        content: agentContent,
+        timestamp: new Date().toISOString(),
+      };
+      setChatHistory((prev) => [...prev, agentMessage]);
     } catch (err: any) {
       setError(err.message || 'An unknown error occurred while sending message.');
       console.error('Error sending message:', err);